@@ -2,36 +2,395 @@
 A fast and simple data management library for machine learning
 """
 
-from typing import Dict, Callable, Iterable, Self
+from typing import Dict, Callable, Iterable, NamedTuple, Tuple, Self
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import copy
+import os
+import weakref
 import numpy as np
 from numpy.typing import NDArray
 
+from . import _kernels
+
+
+# Byte alignment of the arrays held by a DatasetDict, enough for aligned AVX-512 loads
+ALIGNMENT = 64
+# Arrays larger than this have their range estimated from a sample
+APPROX_RANGE_SIZE = 1 << 20
+APPROX_RANGE_SAMPLES = 4096
+# Number of elements of the float64 temporaries used when finding the standard deviation with numpy
+STATS_CHUNK_SIZE = 1 << 16
+
+
+def _data_length(data: Dict[str, NDArray]) -> int:
+    """
+    Find the number of samples in the data, checking that each of the arrays agree upon it.
+    """
+    length = 0
+    for k, v in data.items():
+        if length == 0:
+            length = len(v)
+        elif length != len(v):
+            raise AttributeError(f"Data should be composed of equal length arrays, column {k} has length {len(v)} should be {length}")
+    return length
+
+
+def _gather_index(idx: Iterable[int | bool], length: int, xp=np) -> NDArray:
+    """
+    Convert the indices of a selection into non-negative integer indices that are safe to gather with `mode='clip'`.
+    The indices are given as an array of the `xp` array module, i.e. numpy or cupy.
+    """
+    idx = xp.asarray(idx)
+    if idx.dtype == np.bool_:
+        if idx.shape != (length,):
+            raise IndexError(f"Boolean index has shape {idx.shape} should be ({length},)")
+        return xp.flatnonzero(idx)
+    if idx.size == 0:
+        return idx.astype(np.intp)
+    # Bounds are checked once here so that each of the gathers can skip them
+    idx_min, idx_max = idx.min(), idx.max()
+    if idx_min < -length or idx_max >= length:
+        raise IndexError(f"Index out of bounds for data with {length} samples")
+    if idx_min < 0:
+        idx = xp.where(idx < 0, idx + length, idx)
+    return idx
+
+
+def _mean_std(x: NDArray) -> Tuple[float, float]:
+    """
+    Find the mean and standard deviation of an array with float64 accumulation.
+    The deviations from the mean are found in chunks so that no float64 copy of the whole array is made.
+    """
+    mean = x.mean(dtype=np.float64)
+    rows = max(1, STATS_CHUNK_SIZE * len(x) // max(x.size, 1))
+    sq_dev = 0.0
+    for start in range(0, len(x), rows):
+        dev = np.subtract(x[start:start + rows], mean, dtype=np.float64).ravel()
+        sq_dev += np.dot(dev, dev)
+    return float(mean), float(np.sqrt(sq_dev / x.size))
+
+
+def _feature_keys(data: Dict[str, NDArray]) -> Tuple[str, ...]:
+    """
+    Find the keys of the feature arrays in the data, i.e. those starting with "X".
+    """
+    return tuple(k for k in data.keys() if k.startswith("X"))
+
+
+def _aligned_empty(shape: Tuple[int, ...], dtype: np.dtype) -> NDArray:
+    """
+    Allocate an uninitialised C contiguous array whose data starts on an `ALIGNMENT` byte boundary.
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buffer = np.empty(nbytes + ALIGNMENT, dtype=np.uint8)
+    offset = -buffer.ctypes.data % ALIGNMENT
+    return buffer[offset:offset + nbytes].view(dtype).reshape(shape)
+
+
+def _is_aligned(x: NDArray) -> bool:
+    return x.ctypes.data % ALIGNMENT == 0
+
+
+def _on_gpu(x: NDArray) -> bool:
+    "Check whether an array is a cupy array, i.e. stored on the GPU."
+    return type(x).__module__.split(".")[0] == "cupy"
+
+
+def _array_namespace(x: NDArray):
+    """
+    Get the array module of an array, cupy for arrays on the GPU and numpy otherwise.
+    """
+    if _on_gpu(x):
+        import cupy
+        return cupy
+    return np
+
+
+def _canonical(x: NDArray, align: bool) -> NDArray:
+    """
+    Convert the input into an array, when `align` is set it is also copied into C contiguous, aligned memory if it is not
+    already so. Memory mapped and GPU arrays are left in place.
+    """
+    if isinstance(x, np.memmap) or _on_gpu(x):
+        return x
+    x = np.asarray(x)
+    if not align:
+        return x
+    if x.dtype.hasobject:
+        return np.ascontiguousarray(x)
+    if x.flags.c_contiguous and _is_aligned(x):
+        return x
+    out = _aligned_empty(x.shape, x.dtype)
+    out[...] = x
+    return out
+
+
+def _take(x: NDArray, idx: NDArray) -> NDArray:
+    """
+    Gather the samples at the (already bounds checked) indices into aligned memory.
+    """
+    if x.dtype.hasobject:
+        return np.take(x, idx, axis=0, mode='clip')
+    return np.take(x, idx, axis=0, mode='clip', out=_aligned_empty((len(idx),) + x.shape[1:], x.dtype))
+
+
+def _value_range(x: NDArray) -> str:
+    """
+    Describe the range of values in an array, the range of large arrays is estimated from a sample.
+    """
+    if x.size == 0:
+        return "[]"
+    if x.size > APPROX_RANGE_SIZE and not _on_gpu(x):
+        idx = np.random.default_rng(0).integers(0, x.size, size=APPROX_RANGE_SAMPLES)
+        sample = x.flat[idx]
+        return f"[{sample.min()}, {sample.max()}] (approx)"
+    return f"[{x.min()}, {x.max()}]"
+
+
+class _SharedArray(NamedTuple):
+    "Description of an array held in a shared memory block, this is what gets pickled in place of the array."
+    name: str
+    dtype: np.dtype
+    shape: Tuple[int, ...]
+
+
+def _attach_shared_memory(name: str) -> SharedMemory:
+    try:
+        # Attaching processes should not unlink the block when they exit, the creator owns it
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        return SharedMemory(name=name)
+
+
+def _release_shared_memory(blocks: Iterable[SharedMemory], unlink: bool):
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            # Arrays taken from the DatasetDict still view the block, it is unmapped once they are collected
+            pass
+        if unlink:
+            shm.unlink()
+
 
 class DatasetDict:
     """
     Store and manage split datasets.
+    The arrays may be CuPy arrays, in which case selection, mapping, and normalisation are kept on the GPU.
     """
-    def __init__(self, data: Dict[str, NDArray]):
+    def __init__(self, data: Dict[str, NDArray], align: bool = False):
         """
         Input data is assumed to follow the format `X, Y key -> numpy array`.
+        If `align` is set, arrays that are not C contiguous and aligned to `ALIGNMENT` bytes, which includes most numpy
+        allocations, are copied into memory that is, both here and after `map`. This speeds up the vectorised
+        operations upon them, but the copy temporarily doubles the memory used by the data.
         """
+        canonical = {k: _canonical(v, align) for k, v in data.items()}
+        self.__setup(canonical, {k: v for k, v in canonical.items() if v is not data[k]})
+        self.align = align
+
+    def __setup(self, data: Dict[str, NDArray], owned: Dict[str, NDArray] | None = None):
+        self.align = False
         self.__data = data
-        length = 0
-        for k, v in data.items():
-            if length == 0:
-                length = len(v)
-            elif length != len(v):
-                raise AttributeError(f"Data should be composed of equal length arrays, column {k} has length {len(v)} should be {length}")
-        self.length = length
+        # Arrays that were allocated by this DatasetDict, only these may be written to in place
+        self.__owned = dict(owned) if owned else {}
+        self.length = _data_length(data)
+        self.__feature_keys = _feature_keys(data)
+        self.scales = {}
+        self.__colstore = None
+        self.__shared = {}
+        # The module itself is not kept as it cannot be pickled
+        self.__on_gpu = bool(data) and _on_gpu(next(iter(data.values())))
 
-    def select(self, idx: int | Iterable[int | bool]):
+    def select(self, idx: int | slice | Iterable[int | bool]):
         """
         Return a new DatasetDict that only contains the samples at the indices specified.
+        Selecting with a slice, or a range with a step of one, returns views of the data rather than copies.
 
         Arguments:
         - idx: Index or indices of the samples to take from the data
         """
-        return DatasetDict({k: v[idx] for k, v in self.__data.items()})
+        if isinstance(idx, range) and idx.step == 1 and 0 <= idx.start and 0 <= idx.stop <= self.length:
+            idx = slice(idx.start, idx.stop)
+        if isinstance(idx, slice):
+            selected = self.__select_slice(idx)
+        elif isinstance(idx, (int, np.integer)):
+            selected = DatasetDict({k: v[idx] for k, v in self.__data.items()}, self.align)
+        elif self.__on_gpu:
+            xp = _array_namespace(next(iter(self.__data.values())))
+            idx = _gather_index(idx, self.length, xp)
+            selected = DatasetDict.__new__(DatasetDict)
+            gathered = {k: xp.take(v, idx, axis=0) for k, v in self.__data.items()}
+            selected.__setup(gathered, gathered)
+        else:
+            idx = _gather_index(idx, self.length)
+            selected = self._from_gathered({k: _take(v, idx) for k, v in self._gather_sources().items()})
+        selected.scales = dict(self.scales)
+        selected.align = self.align
+        return selected
+
+    def __select_slice(self, idx: slice) -> Self:
+        # The views are left as they are, so the copying of the constructor is skipped, nor are they owned by the selection
+        selected = DatasetDict.__new__(DatasetDict)
+        selected.__setup({k: v[idx] for k, v in self.__data.items()})
+        if self.__colstore is not None:
+            selected.__colstore = [(store[idx], columns) for store, columns in self.__colstore]
+        return selected
+
+    def _gather_sources(self) -> Dict[str | int, NDArray]:
+        """
+        Get the arrays that a selection gathers from, these are the column stores, indexed by their position, and the
+        arrays that are not within them.
+        """
+        if self.__colstore is None:
+            return dict(self.__data)
+        sources = {i: store for i, (store, _) in enumerate(self.__colstore)}
+        stored = {k for _, columns in self.__colstore for k in columns}
+        sources.update((k, v) for k, v in self.__data.items() if k not in stored)
+        return sources
+
+    def _from_gathered(self, gathered: Dict[str | int, NDArray]) -> Self:
+        """
+        Create the selection from the samples gathered from each of the `_gather_sources`.
+        """
+        data = {k: v for k, v in gathered.items() if isinstance(k, str)}
+        colstore = None
+        if self.__colstore is not None:
+            colstore = []
+            for i, (_, columns) in enumerate(self.__colstore):
+                store = gathered[i]
+                for k, (cols, shape) in columns.items():
+                    data[k] = store[:, cols].reshape((len(store),) + shape)
+                colstore.append((store, columns))
+            data = {k: data[k] for k in self.__data.keys()}
+        # The gathered arrays are new, so they are owned by the selection, and column views are deliberately left
+        # strided, so the copying of the constructor is skipped
+        selected = DatasetDict.__new__(DatasetDict)
+        selected.__setup(data, data)
+        selected.__colstore = colstore
+        selected.scales = dict(self.scales)
+        selected.align = self.align
+        return selected
+
+    def memmap(self, directory: str) -> Self:
+        """
+        Move the arrays into memory mapped `.npy` files so that they are paged in from disk as they are used.
+
+        Arguments:
+        - directory: Directory to store the files in, each array is stored as `<key>.npy`
+        """
+        os.makedirs(directory, exist_ok=True)
+        for k, v in self.__data.items():
+            path = os.path.join(directory, f"{k}.npy")
+            # Write to a new file and then move it into place, as v may itself be mapped from the file at path
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            mapped = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=v.dtype, shape=v.shape)
+            mapped[...] = v
+            mapped.flush()
+            os.replace(tmp_path, path)
+            self.__data[k] = mapped
+            self.__owned[k] = mapped
+        self.__colstore = None
+        return self
+
+    def share(self) -> Self:
+        """
+        Move the arrays into shared memory so that other processes, e.g. dataloader workers, can map the same pages.
+        Pickling a shared DatasetDict then only sends the names, dtypes, and shapes of the arrays rather than their contents.
+        The shared memory is released once this DatasetDict is garbage collected.
+        """
+        created = []
+        for k, v in self.__data.items():
+            if k in self.__shared and self.__shared[k][1] is v:
+                continue
+            if v.dtype.hasobject:
+                raise ValueError(f"Column {k} has object dtype, which cannot be placed in shared memory")
+            shm = SharedMemory(create=True, size=max(v.nbytes, 1))
+            shared = np.ndarray(v.shape, dtype=v.dtype, buffer=shm.buf)
+            shared[...] = v
+            self.__data[k] = shared
+            self.__shared[k] = (shm, shared)
+            self.__owned[k] = shared
+            created.append(shm)
+        weakref.finalize(self, _release_shared_memory, created, True)
+        self.__colstore = None
+        return self
+
+    @classmethod
+    def _attach_shared(cls, data: Dict[str, NDArray | _SharedArray], scales: Dict[str, NDArray]) -> Self:
+        "Reconstruct a DatasetDict pickled by a process that shared it."
+        arrays = {}
+        shared = {}
+        for k, v in data.items():
+            if isinstance(v, _SharedArray):
+                shm = _attach_shared_memory(v.name)
+                arrays[k] = np.ndarray(v.shape, dtype=v.dtype, buffer=shm.buf)
+                shared[k] = (shm, arrays[k])
+            else:
+                arrays[k] = v
+        dataset_dict = cls.__new__(cls)
+        dataset_dict.__setup(arrays)
+        dataset_dict.scales = scales
+        dataset_dict.__shared = shared
+        weakref.finalize(dataset_dict, _release_shared_memory, [shm for shm, _ in shared.values()], False)
+        return dataset_dict
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> Self:
+        # Pickling a shared DatasetDict only sends references to its memory, so the arrays are copied here
+        data = {k: copy.deepcopy(v, memo) if v.dtype.hasobject else v.copy() for k, v in self.__data.items()}
+        copied = DatasetDict.__new__(DatasetDict)
+        copied.__setup(data, data)
+        copied.scales = copy.deepcopy(self.scales, memo)
+        copied.align = self.align
+        memo[id(self)] = copied
+        return copied
+
+    def __reduce_ex__(self, protocol):
+        if not self.__shared:
+            return super().__reduce_ex__(protocol)
+        data = {}
+        for k, v in self.__data.items():
+            if k in self.__shared and self.__shared[k][1] is v:
+                data[k] = _SharedArray(self.__shared[k][0].name, v.dtype, v.shape)
+            else:
+                data[k] = v
+        return (DatasetDict._attach_shared, (data, self.scales))
+
+    def columnar(self) -> Self:
+        """
+        Pack the arrays into a single column store for each dtype, the arrays then become views into these stores.
+        This lets `select` gather all of a sample's values in one pass rather than one pass per array.
+        The stores are dropped when the data is mapped, normalised, or memory mapped.
+        Object arrays cannot be packed, so they are left as they are.
+        """
+        groups = {}
+        for k, v in self.__data.items():
+            if not v.dtype.hasobject:
+                groups.setdefault(v.dtype, []).append(k)
+        self.__colstore = []
+        for dtype, keys in groups.items():
+            widths = [int(np.prod(self.__data[k].shape[1:])) for k in keys]
+            store = _aligned_empty((self.length, sum(widths)), dtype)
+            columns = {}
+            start = 0
+            for k, width in zip(keys, widths):
+                v = self.__data[k]
+                cols = slice(start, start + width)
+                store[:, cols] = v.reshape(self.length, width)
+                self.__data[k] = store[:, cols].reshape(v.shape)
+                self.__owned[k] = self.__data[k]
+                columns[k] = (cols, v.shape[1:])
+                start += width
+            self.__colstore.append((store, columns))
+        return self
+
+    def items(self) -> Iterable[Tuple[str, NDArray]]:
+        """
+        Get the key, array pairs of the data.
+        """
+        return self.__data.items()
 
     def map(self, mapping_fn: Callable[[Dict[str, NDArray]], Dict[str, NDArray]]) -> Self:
         """
@@ -40,111 +399,280 @@ class DatasetDict:
         Arguments:
         - mapping_fn: A function that takes as input a dictionary of format `X, Y key -> numpy array` and returns the same
         """
-        self.__data = mapping_fn(self.__data)
+        mapped = mapping_fn(self.__data)
+        self.__data = {k: _canonical(v, self.align) for k, v in mapped.items()}
+        self.__owned = {k: v for k, v in self.__data.items() if v is not mapped[k]}
+        self.length = _data_length(self.__data)
+        self.__feature_keys = _feature_keys(self.__data)
+        self.__colstore = None
         return self
     
-    def normalise(self, mean: float, std: float) -> Self:
+    def normalise(
+        self, mean: float, std: float, dtype: str | None = None, scales: Dict[str, NDArray] | None = None
+    ) -> Self:
         """
         Perform Guassian normalisation of features of the data according to the input statistics.
+        The features are the arrays with keys starting with "X".
+        Floating point feature arrays that were allocated by this DatasetDict, e.g. by copying, selecting, or an earlier
+        normalisation, are normalised in place to avoid allocating a copy. Arrays passed in by the caller are never modified.
 
         Arguments:
         - mean: Mean value of the sample features
         - std: Standard deviation value of the sample features
+        - dtype: Optionally cast the normalised features to one of "float32", "bfloat16", or "int8".
+          With "int8" the features are quantised per feature, the scale of each is stored in `scales`
+          so that `X_q / scales[k]` recovers the normalised values.
+        - scales: Scales to quantise with when `dtype` is "int8", e.g. those of the training data, otherwise they are
+          found from the features of this DatasetDict
         """
-        for k, v in self.__data.items():
-            if "X" in k:
-                self.__data[k] = (v - mean) / std
+        self.__colstore = None
+        inv_std = 1 / std
+        shift = -mean * inv_std
+        for k in self.__feature_keys:
+            v = self.__data[k]
+            norm_dtype = np.result_type(v.dtype, np.float32)
+            if self.__on_gpu:
+                xp = _array_namespace(v)
+                out = v if v.dtype == norm_dtype and self.__owned.get(k) is v else v.astype(norm_dtype)
+                xp.multiply(out, norm_dtype.type(inv_std), out=out)
+                xp.add(out, norm_dtype.type(shift), out=out)
+                self.__data[k] = out if dtype is None else self.__cast(k, out, dtype, scales)
+                self.__owned[k] = self.__data[k]
+                continue
+            if v.dtype == norm_dtype and v.flags.writeable and self.__owned.get(k) is v:
+                out = v
+            else:
+                out = _aligned_empty(v.shape, norm_dtype)
+            use_kernel = (v.dtype, norm_dtype) in _kernels.ZNORM_DTYPES and v.size > _kernels.MIN_KERNEL_SIZE
+            if use_kernel and v.flags.c_contiguous and out.flags.c_contiguous:
+                _kernels.znorm(v.ravel(), norm_dtype.type(mean), norm_dtype.type(inv_std), out.ravel())
+            else:
+                np.multiply(v, norm_dtype.type(inv_std), out=out)
+                np.add(out, norm_dtype.type(shift), out=out)
+            self.__data[k] = out if dtype is None else self.__cast(k, out, dtype, scales)
+            self.__owned[k] = self.__data[k]
         return self
 
-    def normalize(self, mean: float, std: float) -> Self:
+    def __cast(self, k: str, x: NDArray, dtype: str, scales: Dict[str, NDArray] | None) -> NDArray:
+        if dtype == "float32":
+            return x.astype(np.float32, copy=False)
+        if dtype == "bfloat16":
+            try:
+                import ml_dtypes
+            except ImportError:
+                raise ImportError("ml_dtypes is required for bfloat16 features, install it with `pip install ml_dtypes`")
+            return x.astype(ml_dtypes.bfloat16)
+        if dtype == "int8":
+            if scales is not None and k in scales:
+                scale = scales[k]
+            else:
+                abs_max = np.max(np.abs(x), axis=0)
+                scale = np.divide(127, abs_max, out=np.ones_like(abs_max, dtype=np.float32), where=abs_max > 0)
+            self.scales[k] = scale
+            # Values beyond the range the scales were found from are saturated rather than wrapped
+            return np.clip(np.round(x * scale), -127, 127).astype(np.int8)
+        raise ValueError(f"Unsupported dtype {dtype}, should be one of float32, bfloat16, or int8")
+
+    def normalize(
+        self, mean: float, std: float, dtype: str | None = None, scales: Dict[str, NDArray] | None = None
+    ) -> Self:
         """
         Perform Guassian normalization of features of the data according to the input statistics.
 
         Arguments:
         - mean: Mean value of the sample features
         - std: Standard deviation value of the sample features
+        - dtype: Optionally cast the normalized features to one of "float32", "bfloat16", or "int8"
+        - scales: Scales to quantise with when `dtype` is "int8"
+        """
+        return self.normalise(mean, std, dtype, scales)
+
+    @property
+    def on_gpu(self) -> bool:
+        "Whether the arrays are CuPy arrays stored on the GPU."
+        return self.__on_gpu
+
+    @property
+    def meta(self) -> Dict[str, Dict[str, bool]]:
         """
-        return self.normalise(mean, std)
+        Memory layout details of each of the arrays, i.e. whether they are C contiguous and aligned to `ALIGNMENT` bytes.
+        """
+        return {k: {"contiguous": v.flags.c_contiguous, "aligned": _is_aligned(v)} for k, v in self.__data.items()}
 
     def __getitem__(self, i: str) -> NDArray:
         return self.__data[i]
     
     def __len__(self) -> int:
-        return len(self.__data['X'])
+        return self.length
     
     def __str__(self) -> str:
         return str(self.__data)
     
     def short_details(self) -> str:
         "Give shortened details on the structure of the data."
-        details = "{"
-        for k, v in self.__data.items():
-            details += f"{k}: type {v.dtype}, shape {v.shape}, range [{v.min()}, {v.max()}], "
-        details = details[:-2] + "}"
-        return details
+        details = [f"{k}: type {v.dtype}, shape {v.shape}, range {_value_range(v)}" for k, v in self.__data.items()]
+        return "{" + ", ".join(details) + "}"
 
 
 class Dataset:
     """
     Store and manage a whole dataset.
     """
-    def __init__(self, data: Dict[str, Dict[str, NDArray] | DatasetDict]):
+    def __init__(
+        self, data: Dict[str, Dict[str, NDArray] | DatasetDict], mmap_dir: str | None = None, align: bool = False
+    ):
         """
         Input data when creating a dataset is assumed to follow the format of `train/test/validation/etc. key -> X, Y keys -> numpy array`.
         Data is always assumed to have at least a train key with the corresponding structure underneath.
+        If `mmap_dir` is given, the arrays are stored as memory mapped files under `mmap_dir/<split>/<key>.npy`.
+        If `align` is set, the arrays are copied into aligned memory as described in `DatasetDict`.
         """
-        if np.all([isinstance(v, DatasetDict) for v in data.values()]):
+        if all(isinstance(v, DatasetDict) for v in data.values()):
             self.__data = data
         else:
-            self.__data = {k: DatasetDict(v) for k, v in data.items()}
+            self.__data = {k: DatasetDict(v, align) for k, v in data.items()}
+        self.__stats = None
+        self.__stats_given = False
+        self.__normalised = False
+        if mmap_dir is not None:
+            for k, v in self.__data.items():
+                v.memmap(os.path.join(mmap_dir, k))
     
     def __getitem__(self, i: str) -> DatasetDict:
         return self.__data[i]
 
+    def __unique_splits(self) -> Iterable[DatasetDict]:
+        "Get each of the split datasets once, even when a DatasetDict is used for multiple splits."
+        return {id(v): v for v in self.__data.values()}.values()
+
     def __str__(self) -> str:
-        string = "{\n"
-        for k, v in self.__data.items():
-            string += f"\t{k}: {v.short_details()}\n"
-        string += "}"
-        return string
+        return "{\n" + "".join(f"\t{k}: {v.short_details()}\n" for k, v in self.__data.items()) + "}"
     
-    def map(self, mapping_fn: Callable[[Dict[str, NDArray]], Dict[str, NDArray]]) -> Self:
+    def map(self, mapping_fn: Callable[[Dict[str, NDArray]], Dict[str, NDArray]], parallel: bool = False) -> Self:
         """
         Apply a mapping upon each of the split datasets.
 
         Arguments:
         - mapping_fn: A function that takes as input a split dataset of format `X, Y keys -> numpy array` and returns one of the same format
+        - parallel: Whether to map each of the splits in a separate thread, this speeds up mappings that release the GIL, such as numpy operations
+
+        The mapped data is treated as unnormalised, and statistics found by an earlier normalisation are discarded.
         """
-        for v in self.__data.values():
-            v.map(mapping_fn)
+        self.__normalised = False
+        if not self.__stats_given:
+            self.__stats = None
+        splits = list(self.__unique_splits())
+        if not parallel:
+            for v in splits:
+                v.map(mapping_fn)
+            return self
+        with ThreadPoolExecutor(max_workers=max(len(splits), 1)) as executor:
+            # Consume the results so that exceptions from the mapping are raised
+            list(executor.map(lambda v: v.map(mapping_fn), splits))
         return self
     
+    def columnar(self) -> Self:
+        """
+        Pack the arrays of each of the split datasets into column stores, see `DatasetDict.columnar`.
+        """
+        for v in self.__unique_splits():
+            v.columnar()
+        return self
+
     def keys(self) -> Iterable[str]:
         """
         Get the top level keys of the dataset, i.e., the split of the dataset.
         """
         return self.__data.keys()
 
-    def select(self, idx_dict: Dict[str, int | Iterable[int | bool]]):
+    def select(self, idx_dict: Dict[str, int | slice | Iterable[int | bool]], parallel: bool = False):
         """
         Return a subdataset which includes only the data at the specified indices.
 
         Arguments:
         - idx_dict: A dictionary with the format of `train/test/validation/etc. key -> numpy array of indices`
+        - parallel: Whether to gather each of the arrays in a separate thread
         """
-        return Dataset({k: self.__data[k].select(idx) for k, idx in idx_dict.items()})
+        serial = any(isinstance(idx, (int, np.integer, slice, range)) for idx in idx_dict.values())
+        serial = serial or any(self.__data[k].on_gpu for k in idx_dict.keys())
+        if not parallel or serial:
+            selected = Dataset({k: self.__data[k].select(idx) for k, idx in idx_dict.items()})
+        else:
+            selected = self.__parallel_select(idx_dict)
+        selected.__stats = self.__stats
+        selected.__stats_given = self.__stats_given
+        selected.__normalised = self.__normalised
+        return selected
+
+    def __parallel_select(self, idx_dict: Dict[str, Iterable[int | bool]]) -> Self:
+        tasks = []
+        for split, idx in idx_dict.items():
+            idx = _gather_index(idx, self.__data[split].length)
+            tasks.extend((split, k, v, idx) for k, v in self.__data[split]._gather_sources().items())
+        with ThreadPoolExecutor(max_workers=max(len(tasks), 1)) as executor:
+            results = executor.map(lambda task: _take(task[2], task[3]), tasks)
+            gathered = {split: {} for split in idx_dict.keys()}
+            for (split, k, _, _), v in zip(tasks, results):
+                gathered[split][k] = v
+        return Dataset({split: self.__data[split]._from_gathered(g) for split, g in gathered.items()})
 
-    def normalise(self) -> Self:
+    @property
+    def stats(self) -> Tuple[float, float] | None:
+        """
+        The mean and standard deviation used to normalise the data, or None if they are yet to be found.
+        """
+        return self.__stats
+
+    def with_stats(self, mean: float, std: float) -> Self:
+        """
+        Set the statistics to normalise with, e.g. those of the training data when preparing data for inference.
+
+        Arguments:
+        - mean: Mean value of the sample features
+        - std: Standard deviation value of the sample features
+        """
+        self.__stats = (float(mean), float(std))
+        self.__stats_given = True
+        return self
+
+    def normalise(self, dtype: str | None = None) -> Self:
         """
         Normalise the data to the standard Guassian distribution on the basis of the training dataset.
+        The statistics of the training dataset are found once and kept in `stats`, unless they were set with `with_stats`.
+        Normalising an already normalised dataset leaves it unchanged.
+
+        Arguments:
+        - dtype: Optionally cast the normalised features to one of "float32", "bfloat16", or "int8",
+          the int8 scales are found from the training dataset and shared by all of the splits
         """
-        mean = self.__data['train']['X'].mean()
-        std = self.__data['train']['X'].std()
-        self.__data = {k: v.normalise(mean, std) for k, v in self.__data.items()}
+        if self.__normalised:
+            return self
+        if self.__stats is None:
+            x = self.__data['train']['X']
+            if _on_gpu(x):
+                xp = _array_namespace(x)
+                mean = xp.mean(x, dtype=xp.float64)
+                self.__stats = (float(mean), float(xp.sqrt(xp.mean(xp.square(x - mean)))))
+            elif x.dtype in _kernels.MEAN_STD_DTYPES and x.size > _kernels.MIN_KERNEL_SIZE and x.flags.forc:
+                mean, std = _kernels.mean_std(x.ravel(order='K'))
+                self.__stats = (float(mean), float(std))
+            else:
+                self.__stats = _mean_std(x)
+        mean, std = self.__stats
+        scales = None
+        if 'train' in self.__data:
+            scales = self.__data['train'].normalise(mean, std, dtype).scales
+        for v in self.__unique_splits():
+            if 'train' not in self.__data or v is not self.__data['train']:
+                v.normalise(mean, std, dtype, scales)
+        self.__normalised = True
         return self
     
-    def normalize(self) -> Self:
+    def normalize(self, dtype: str | None = None) -> Self:
         """
         Normalize the data to the standard Guassian distribution on the basis of the training dataset.
+
+        Arguments:
+        - dtype: Optionally cast the normalized features to one of "float32", "bfloat16", or "int8"
         """
-        return self.normalise()
\ No newline at end of file
+        return self.normalise(dtype)
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""
+Compiled kernels for the hot loops of the library, these are only available when numba is installed.
+numba is only imported, and the kernels compiled, once a kernel is first called, compilations are cached to disk.
+The supported (input, output) dtypes are listed for callers to dispatch on.
+"""
+
+import importlib.util
+import numpy as np
+
+
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+# Below this many elements the numpy routines are quicker than dispatching to the compiled kernels
+MIN_KERNEL_SIZE = 1 << 18
+
+# Pairs of (feature dtype, normalised dtype) that znorm supports
+ZNORM_DTYPES = set()
+# Feature dtypes that mean_std supports
+MEAN_STD_DTYPES = set()
+
+if NUMBA_AVAILABLE:
+    ZNORM_DTYPES.update([
+        (np.dtype(np.uint8), np.dtype(np.float32)),
+        (np.dtype(np.float32), np.dtype(np.float32)),
+        (np.dtype(np.float64), np.dtype(np.float64)),
+    ])
+    MEAN_STD_DTYPES.update([np.dtype(np.uint8), np.dtype(np.float32), np.dtype(np.float64)])
+
+
+def znorm(x, mean, inv_std, out):
+    """
+    Gaussian normalise the contiguous flat array x into out.
+    """
+    from . import _numba_kernels
+    _numba_kernels.znorm(x, mean, inv_std, out)
+
+
+def mean_std(x):
+    """
+    Find the mean and standard deviation of the contiguous flat array x in a single pass.
+    """
+    from . import _numba_kernels
+    return _numba_kernels.mean_std(x)
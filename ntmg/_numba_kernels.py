@@ -0,0 +1,57 @@
+"""
+Numba compiled kernels, this module imports numba so it is only imported by `_kernels` when a kernel is first used.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+# Number of blocks that the statistics reduction is split across for parallel accumulation
+STATS_BLOCKS = 256
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def znorm(x, mean, inv_std, out):
+    """
+    Gaussian normalise the flat array x into out.
+    """
+    for i in prange(x.shape[0]):
+        out[i] = (x[i] - mean) * inv_std
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def mean_std(x):
+    """
+    Find the mean and standard deviation of the flat array x in a single pass.
+    Each block accumulates the sum and sum of squares of its values shifted by its first value, which keeps them
+    numerically stable without a division per element, then the blocks are merged with Chan et al.'s formula.
+    """
+    n = x.shape[0]
+    n_blocks = min(n, STATS_BLOCKS)
+    counts = np.zeros(n_blocks)
+    means = np.zeros(n_blocks)
+    m2s = np.zeros(n_blocks)
+    for b in prange(n_blocks):
+        start = b * n // n_blocks
+        end = (b + 1) * n // n_blocks
+        shift = np.float64(x[start])
+        total = 0.0
+        total_sq = 0.0
+        for i in range(start, end):
+            d = np.float64(x[i]) - shift
+            total += d
+            total_sq += d * d
+        count = end - start
+        counts[b] = count
+        means[b] = shift + total / count
+        m2s[b] = max(total_sq - total * total / count, 0.0)
+    count = counts[0]
+    mean = means[0]
+    m2 = m2s[0]
+    for b in range(1, n_blocks):
+        total = count + counts[b]
+        delta = means[b] - mean
+        mean += delta * counts[b] / total
+        m2 += m2s[b] + delta * delta * count * counts[b] / total
+        count = total
+    return mean, np.sqrt(m2 / count)
@@ -0,0 +1,239 @@
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+import ntmg
+
+
+def make_data(n: int = 10, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return {
+        "train": {"X": rng.normal(3, 2, size=(n, 4)).astype(np.float32), "Y": rng.integers(0, 2, size=n)},
+        "test": {"X": rng.normal(3, 2, size=(n // 2, 4)).astype(np.float32), "Y": rng.integers(0, 2, size=n // 2)},
+    }
+
+
+def test_pickle_roundtrip():
+    data = ntmg.Dataset(make_data())
+    loaded = pickle.loads(pickle.dumps(data))
+    np.testing.assert_array_equal(loaded["train"]["X"], data["train"]["X"])
+    np.testing.assert_array_equal(loaded["test"]["Y"], data["test"]["Y"])
+
+
+def test_deepcopy():
+    data = ntmg.Dataset(make_data())
+    copied = copy.deepcopy(data)
+    np.testing.assert_array_equal(copied["train"]["X"], data["train"]["X"])
+
+
+def test_normalise_standardises_train():
+    data = ntmg.Dataset(make_data(1000)).normalise()
+    np.testing.assert_allclose(data["train"]["X"].mean(), 0, atol=1e-5)
+    np.testing.assert_allclose(data["train"]["X"].std(), 1, atol=1e-5)
+
+
+def test_normalise_does_not_modify_inputs():
+    raw = make_data()
+    original = raw["train"]["X"].copy()
+    ntmg.Dataset(raw).normalise()
+    np.testing.assert_array_equal(raw["train"]["X"], original)
+
+
+def test_normalise_array_shared_between_splits():
+    x = np.random.default_rng(0).normal(3, 2, size=(100, 4)).astype(np.float32)
+    data = ntmg.Dataset({"train": {"X": x}, "test": {"X": x}}).normalise()
+    np.testing.assert_allclose(data["train"]["X"].std(), 1, atol=1e-5)
+    np.testing.assert_allclose(data["test"]["X"].std(), 1, atol=1e-5)
+
+
+def test_normalise_dataset_dict_shared_between_splits():
+    x = np.random.default_rng(0).normal(3, 2, size=(100, 4)).astype(np.float32)
+    split = ntmg.DatasetDict({"X": x})
+    data = ntmg.Dataset({"train": split, "test": split}).normalise()
+    np.testing.assert_allclose(data["train"]["X"].std(), 1, atol=1e-5)
+
+
+@pytest.mark.parametrize("idx", [slice(None), slice(0, 10), range(0, 10), slice(2, 5)])
+def test_slice_select_is_view_and_not_normalised_in_place(idx):
+    split = ntmg.DatasetDict({"X": np.arange(40, dtype=np.float32).reshape(10, 4), "Y": np.arange(10)})
+    original = split["X"].copy()
+    selection = split.select(idx)
+    assert np.shares_memory(selection["X"], split["X"])
+    selection.normalise(5.0, 2.0)
+    np.testing.assert_array_equal(split["X"], original)
+    np.testing.assert_allclose(selection["X"], (original[idx if isinstance(idx, slice) else slice(0, 10)] - 5) / 2)
+
+
+def test_normalise_is_idempotent():
+    data = ntmg.Dataset(make_data(100)).normalise()
+    normalised = data["train"]["X"].copy()
+    data.normalise()
+    np.testing.assert_array_equal(data["train"]["X"], normalised)
+
+
+def test_normalise_after_map():
+    data = ntmg.Dataset({"train": {"X": np.array([1.0, 2.0, 3.0])}}).normalise()
+    data.map(lambda d: {"X": np.array([5.0, 6.0, 7.0])}).normalise()
+    np.testing.assert_allclose(data["train"]["X"], [-1.224745, 0, 1.224745], rtol=1e-5)
+
+
+def test_stats_are_floats():
+    data = ntmg.Dataset(make_data()).normalise()
+    assert all(type(s) is float for s in data.stats)
+
+
+def test_with_stats():
+    data = ntmg.Dataset({"test": {"X": np.array([1.0, 3.0])}}).with_stats(1.0, 2.0).normalise()
+    np.testing.assert_allclose(data["test"]["X"], [0.0, 1.0])
+    assert data.stats == (1.0, 2.0)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_select(parallel):
+    raw = make_data()
+    data = ntmg.Dataset(raw)
+    selected = data.select({"train": [1, 2, 3], "test": np.arange(5) % 2 == 0}, parallel=parallel)
+    np.testing.assert_array_equal(selected["train"]["X"], raw["train"]["X"][[1, 2, 3]])
+    np.testing.assert_array_equal(selected["test"]["Y"], raw["test"]["Y"][[0, 2, 4]])
+    assert len(selected["train"]) == 3
+
+
+def test_parallel_select_range_is_view():
+    raw = make_data()
+    selected = ntmg.Dataset(raw).select({"train": range(0, 5), "test": [0, 1]}, parallel=True)
+    assert np.shares_memory(selected["train"]["X"], raw["train"]["X"])
+    np.testing.assert_array_equal(selected["test"]["X"], raw["test"]["X"][[0, 1]])
+
+
+def test_parallel_select_normalises_in_place():
+    raw = make_data()
+    selected = ntmg.Dataset(raw).select({"train": [1, 2, 3], "test": [0, 1]}, parallel=True)
+    x = selected["train"]["X"]
+    selected.normalise()
+    # The gathered arrays belong to the selection, so they are normalised in place as in the serial path
+    assert selected["train"]["X"] is x
+    np.testing.assert_allclose(x.mean(), 0.0, atol=1e-5)
+
+
+def test_select_out_of_bounds():
+    with pytest.raises(IndexError):
+        ntmg.DatasetDict({"X": np.zeros((3, 2))}).select([0, 3])
+
+
+def test_selection_scales_are_independent():
+    split = ntmg.DatasetDict({"X": np.random.default_rng(0).normal(size=(10, 4))})
+    split.normalise(0.0, 1.0, dtype="int8")
+    parent_scale = split.scales["X"].copy()
+    selection = split.select([0, 1])
+    selection.map(lambda d: {"X": d["X"].astype(np.float32) * 2}).normalise(0.0, 1.0, dtype="int8")
+    np.testing.assert_array_equal(split.scales["X"], parent_scale)
+
+
+def test_int8_round_trip():
+    data = ntmg.Dataset(make_data(1000)).normalise(dtype="int8")
+    x_q = data["train"]["X"]
+    assert x_q.dtype == np.int8
+    assert np.abs(x_q).max() == 127
+    expected = ntmg.Dataset(make_data(1000)).normalise()["train"]["X"]
+    np.testing.assert_allclose(x_q / data["train"].scales["X"], expected, atol=0.5 / data["train"].scales["X"].min())
+
+
+def test_int8_scales_from_train():
+    data = ntmg.Dataset(make_data(100)).normalise(dtype="int8")
+    np.testing.assert_array_equal(data["test"].scales["X"], data["train"].scales["X"])
+    assert data["test"]["X"].dtype == np.int8
+
+
+def test_float32_cast():
+    raw = make_data()
+    raw["train"]["X"] = raw["train"]["X"].astype(np.float64)
+    raw["test"]["X"] = raw["test"]["X"].astype(np.float64)
+    data = ntmg.Dataset(raw).normalise(dtype="float32")
+    assert data["train"]["X"].dtype == np.float32
+
+
+def test_bfloat16_cast():
+    ml_dtypes = pytest.importorskip("ml_dtypes")
+    expected = ntmg.Dataset(make_data()).normalise()
+    data = ntmg.Dataset(make_data()).normalise(dtype="bfloat16")
+    for split in ["train", "test"]:
+        assert data[split]["X"].dtype == ml_dtypes.bfloat16
+        np.testing.assert_allclose(data[split]["X"].astype(np.float32), expected[split]["X"], rtol=1e-2, atol=1e-2)
+        np.testing.assert_array_equal(data[split]["Y"], expected[split]["Y"])
+
+
+def test_cupy_select_and_normalise():
+    cp = pytest.importorskip("cupy")
+    x = cp.arange(20, dtype=cp.float32).reshape(10, 2)
+    data = ntmg.Dataset({"train": {"X": x, "Y": cp.arange(10)}})
+    selected = data.select({"train": cp.arange(10) % 2 == 0})
+    assert isinstance(selected["train"]["X"], cp.ndarray)
+    cp.testing.assert_array_equal(selected["train"]["Y"], cp.arange(0, 10, 2))
+    cp.testing.assert_array_equal(data.select({"train": cp.asarray([1, -1])})["train"]["Y"], cp.asarray([1, 9]))
+    data.normalise()
+    assert isinstance(data["train"]["X"], cp.ndarray)
+    np.testing.assert_allclose(float(data["train"]["X"].std()), 1, atol=1e-5)
+
+
+def test_align_is_opt_in():
+    x = np.arange(40, dtype=np.float32).reshape(10, 4)
+    assert ntmg.DatasetDict({"X": x})["X"] is x
+    aligned = ntmg.DatasetDict({"X": x[:, ::2]}, align=True)
+    assert aligned.meta["X"] == {"contiguous": True, "aligned": True}
+    np.testing.assert_array_equal(aligned["X"], x[:, ::2])
+    mapped = aligned.map(lambda d: {"X": d["X"][:, ::-1]})
+    assert mapped.meta["X"] == {"contiguous": True, "aligned": True}
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_map(parallel):
+    raw = make_data()
+    expected = {k: v["X"] * 2 for k, v in raw.items()}
+    data = ntmg.Dataset(raw).map(lambda d: {"X": d["X"] * 2, "Y": d["Y"]}, parallel=parallel)
+    for k, v in expected.items():
+        np.testing.assert_array_equal(data[k]["X"], v)
+
+
+def test_parallel_map_raises():
+    def fail(d):
+        raise ValueError("mapping failed")
+
+    with pytest.raises(ValueError):
+        ntmg.Dataset(make_data()).map(fail, parallel=True)
+
+
+def test_short_details_matches_numpy():
+    x = np.array([[0.1, 0.7], [0.3, np.nan]], dtype=np.float32)
+    y = np.array([3, 1])
+    details = ntmg.DatasetDict({"X": x, "Y": y}).short_details()
+    assert f"range [{x.min()}, {x.max()}]" in details
+    assert f"range [{y.min()}, {y.max()}]" in details
+
+
+def test_short_details_samples_large_arrays():
+    x = np.arange(ntmg.APPROX_RANGE_SIZE + 1, dtype=np.float32)
+    details = ntmg.DatasetDict({"X": x}).short_details()
+    assert "(approx)" in details
+
+
+def test_unequal_lengths():
+    with pytest.raises(AttributeError, match="column Y has length 2 should be 3"):
+        ntmg.DatasetDict({"X": np.zeros(3), "Y": np.zeros(2)})
+
+
+@pytest.mark.parametrize("shape", [(1000,), (100, 7, 3), (3, 50000)])
+def test_mean_std(shape):
+    x = np.random.default_rng(0).normal(3, 2, size=shape).astype(np.float32)
+    for arr in (x, x[:, ::2] if x.ndim > 1 else x[::2]):
+        mean, std = ntmg._mean_std(arr)
+        np.testing.assert_allclose(mean, arr.mean(dtype=np.float64))
+        np.testing.assert_allclose(std, arr.std(dtype=np.float64))
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_map_dataset_dict_shared_between_splits(parallel):
+    split = ntmg.DatasetDict({"X": np.ones(3)})
+    data = ntmg.Dataset({"train": split, "test": split}).map(lambda d: {"X": d["X"] + 1}, parallel=parallel)
+    np.testing.assert_array_equal(data["test"]["X"], [2, 2, 2])
@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+numba = pytest.importorskip("numba")
+
+import ntmg
+from ntmg import _kernels
+
+
+def test_numba_available():
+    assert _kernels.NUMBA_AVAILABLE
+
+
+def test_import_does_not_compile():
+    code = "import sys, ntmg; assert 'numba' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32, np.float64])
+def test_znorm(dtype):
+    x = np.arange(100, dtype=dtype)
+    norm_dtype = np.result_type(dtype, np.float32)
+    out = np.empty(x.shape, dtype=norm_dtype)
+    _kernels.znorm(x, norm_dtype.type(10), norm_dtype.type(0.5), out)
+    np.testing.assert_allclose(out, (x.astype(norm_dtype) - 10) * 0.5, rtol=1e-6)
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32, np.float64])
+def test_mean_std(dtype):
+    x = np.random.default_rng(0).uniform(0, 100, size=10_000).astype(dtype)
+    mean, std = _kernels.mean_std(x)
+    np.testing.assert_allclose(mean, x.mean(dtype=np.float64))
+    np.testing.assert_allclose(std, x.std(dtype=np.float64))
+
+
+def test_large_normalise_uses_kernels():
+    x = np.random.default_rng(0).normal(3, 2, size=(_kernels.MIN_KERNEL_SIZE + 1,)).astype(np.float32)
+    data = ntmg.Dataset({"train": {"X": x.copy(), "Y": np.zeros(len(x))}})
+    data.normalise()
+    np.testing.assert_allclose(data["train"]["X"].mean(), 0, atol=1e-4)
+    np.testing.assert_allclose(data["train"]["X"].std(), 1, atol=1e-4)
+
+
+
+def test_mean_std_large_offset():
+    x = (1e6 + np.random.default_rng(0).normal(0, 1, size=100_000)).astype(np.float64)
+    mean, std = _kernels.mean_std(x)
+    np.testing.assert_allclose(mean, x.mean())
+    np.testing.assert_allclose(std, x.std(), rtol=1e-7)
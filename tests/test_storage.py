@@ -0,0 +1,126 @@
+import copy
+import multiprocessing
+import pickle
+
+import numpy as np
+import pytest
+
+import ntmg
+
+
+def make_split(n: int = 1000):
+    rng = np.random.default_rng(0)
+    return {"X": rng.normal(3, 2, size=(n, 8)).astype(np.float32), "Y": rng.integers(0, 10, size=n)}
+
+
+def sum_features(split: ntmg.DatasetDict) -> float:
+    return float(split["X"].sum())
+
+
+def test_share_pickles_names_only():
+    raw = make_split()
+    split = ntmg.DatasetDict(raw).share()
+    payload = pickle.dumps(split)
+    assert len(payload) < raw["X"].nbytes // 10
+    attached = pickle.loads(payload)
+    np.testing.assert_array_equal(attached["X"], raw["X"])
+    np.testing.assert_array_equal(attached["Y"], raw["Y"])
+    assert len(attached) == len(raw["Y"])
+
+
+def test_share_visible_to_other_processes():
+    raw = make_split()
+    split = ntmg.DatasetDict(raw).share()
+    with multiprocessing.get_context("spawn").Pool(2) as pool:
+        sums = pool.map(sum_features, [split, split])
+    np.testing.assert_allclose(sums, raw["X"].sum(), rtol=1e-5)
+
+
+def test_share_normalises_in_place():
+    split = ntmg.DatasetDict(make_split()).share()
+    shared_x = split["X"]
+    split.normalise(3.0, 2.0)
+    assert split["X"] is shared_x
+    attached = pickle.loads(pickle.dumps(split))
+    np.testing.assert_array_equal(attached["X"], split["X"])
+
+
+def test_memmap_write_back(tmp_path):
+    raw = make_split()
+    data = ntmg.Dataset({"train": raw}, mmap_dir=str(tmp_path))
+    assert isinstance(data["train"]["X"], np.memmap)
+    data.normalise()
+    assert isinstance(data["train"]["X"], np.memmap)
+    data["train"]["X"].flush()
+    stored = np.load(tmp_path / "train" / "X.npy")
+    np.testing.assert_allclose(stored.mean(), 0, atol=1e-5)
+    np.testing.assert_array_equal(np.load(tmp_path / "train" / "Y.npy"), raw["Y"])
+
+
+def test_memmap_does_not_modify_inputs(tmp_path):
+    raw = make_split()
+    original = raw["X"].copy()
+    ntmg.Dataset({"train": raw}, mmap_dir=str(tmp_path)).normalise()
+    np.testing.assert_array_equal(raw["X"], original)
+
+
+def test_columnar_select():
+    raw = make_split(20)
+    raw["X2"] = np.arange(20, dtype=np.float32)
+    split = ntmg.DatasetDict(raw).columnar()
+    idx = [3, 0, 19, 7]
+    selected = split.select(idx)
+    for k in raw:
+        np.testing.assert_array_equal(selected[k], raw[k][idx])
+    # Selections of a columnar DatasetDict are themselves columnar
+    np.testing.assert_array_equal(selected.select([1, 2])["X"], raw["X"][[0, 19]])
+    np.testing.assert_array_equal(split.select(slice(2, 5))["X2"], raw["X2"][2:5])
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_columnar_dataset_select(parallel):
+    raw = make_split(20)
+    raw["names"] = np.array([f"sample {i}" for i in range(20)], dtype=object)
+    data = ntmg.Dataset({"train": raw, "test": make_split(10)}).columnar()
+    selected = data.select({"train": [3, 0, 19, 7], "test": [1, 2]}, parallel=parallel)
+    for k in raw:
+        np.testing.assert_array_equal(selected["train"][k], raw[k][[3, 0, 19, 7]])
+    # Selections of a columnar Dataset are themselves columnar
+    np.testing.assert_array_equal(selected["train"].select([1, 2])["X"], raw["X"][[0, 19]])
+
+
+def test_columnar_normalise():
+    raw = make_split(20)
+    split = ntmg.DatasetDict(raw).columnar().normalise(3.0, 2.0)
+    np.testing.assert_allclose(split["X"], (raw["X"] - 3) / 2, rtol=1e-6)
+    np.testing.assert_array_equal(split.select([1, 2])["Y"], raw["Y"][[1, 2]])
+
+
+def test_memmap_same_directory_twice(tmp_path):
+    raw = make_split(8)
+    split = ntmg.DatasetDict(raw).memmap(str(tmp_path)).memmap(str(tmp_path))
+    np.testing.assert_array_equal(split["X"], raw["X"])
+    np.testing.assert_array_equal(np.load(tmp_path / "X.npy"), raw["X"])
+    data = ntmg.Dataset({"train": raw}, mmap_dir=str(tmp_path))
+    reused = ntmg.Dataset({"train": {k: data["train"][k] for k in raw}}, mmap_dir=str(tmp_path))
+    np.testing.assert_array_equal(reused["train"]["X"], raw["X"])
+    assert sorted(p.name for p in (tmp_path / "train").iterdir()) == ["X.npy", "Y.npy"]
+
+
+def test_deepcopy_of_shared_is_independent():
+    raw = make_split(8)
+    split = ntmg.DatasetDict(raw).share()
+    copied = copy.deepcopy(split)
+    copied["X"][0, 0] = 99
+    assert split["X"][0, 0] == raw["X"][0, 0]
+    np.testing.assert_array_equal(copied["Y"], raw["Y"])
+
+
+def test_columnar_with_object_column():
+    raw = make_split(10)
+    raw["names"] = np.array([f"sample {i}" for i in range(10)], dtype=object)
+    split = ntmg.DatasetDict(raw).columnar()
+    assert split["names"] is raw["names"]
+    selected = split.select([4, 2])
+    np.testing.assert_array_equal(selected["names"], raw["names"][[4, 2]])
+    np.testing.assert_array_equal(selected["X"], raw["X"][[4, 2]])